@@ -17,7 +17,9 @@
 
 
 import logging
-from typing import Dict
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
 
 import pandas as pd
 from cobra_component_models.orm import (
@@ -29,6 +31,14 @@ from cobra_component_models.orm import (
 from sqlalchemy.orm import sessionmaker
 from tqdm import tqdm
 
+from ..etl import split_names
+from ..etl.compartment import (
+    CompartmentPayload,
+    build_compartment_worker_batch,
+    initialize_compartment_worker,
+)
+from .helpers import insert_rows, map_bounded
+
 
 logger = logging.getLogger()
 Session = sessionmaker()
@@ -40,7 +50,8 @@ def etl_compartments(
     cross_references: pd.DataFrame,
     deprecated: pd.DataFrame,
     mapping: Dict[str, Namespace],
-    batch_size: int = 1000,
+    batch_size: int = 10_000,
+    processes: Optional[int] = None,
 ):
     """
     Load compartment information into a database.
@@ -53,98 +64,97 @@ def etl_compartments(
     deprecated
     mapping
     batch_size : int
+        The number of rows transformed and inserted per executemany statement.
+        Larger batches mean fewer round trips at the cost of more memory.
+    processes : int, optional
+        The number of worker processes used to transform batches in parallel
+        (default the number of available cores).
 
     """
-    # TODO: This is a first draft of the function. Parts should be refactored to the
-    #  etl sub-package so that they can be tested better.
-    grouped_xref = cross_references.groupby("mnx_id", sort=False)
-    grouped_deprecated = deprecated.groupby("current_id", sort=False)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    # Report prefixes that cannot be resolved once, rather than per row in the
+    # hot loops below. Missing values are not prefixes and are skipped; they
+    # would also break sorting the mixed-type set.
+    unknown_prefixes = (
+        set(compartments["prefix"].unique())
+        | set(cross_references["prefix"].unique())
+    ) - mapping.keys()
+    for prefix in sorted(p for p in unknown_prefixes if isinstance(p, str)):
+        logger.error(f"Unknown prefix '{prefix}' encountered.")
+    # Plain dictionaries of row tuples avoid the per-row DataFrame slice that
+    # `groupby.get_group` constructs inside the hot loop. They also cross
+    # process boundaries cheaply, unlike ORM objects.
+    xref_by_mnx = {}
+    for xref_row, xref_names in zip(
+        cross_references.itertuples(index=False),
+        split_names(cross_references["description"]),
+    ):
+        xref_by_mnx.setdefault(xref_row.mnx_id, []).append(
+            (xref_row.prefix, xref_row.identifier, xref_names)
+        )
+    depr_by_mnx = {}
+    for depr_row in deprecated.itertuples(index=False):
+        depr_by_mnx.setdefault(depr_row.current_id, []).append(depr_row.deprecated_id)
+    prefix_to_nsid = {prefix: namespace.id for prefix, namespace in mapping.items()}
+    # Iterating zipped column arrays avoids both the DataFrame slice copy made by
+    # `iloc` and the per-row namedtuple that `itertuples` allocates.
+    mnx_id_col = compartments["mnx_id"].to_numpy()
+    name_set_col = split_names(compartments["name"])
+    prefix_col = compartments["prefix"].to_numpy()
+    identifier_col = compartments["identifier"].to_numpy()
+    chunks = (
+        list(
+            zip(
+                mnx_id_col[index : index + batch_size],
+                name_set_col[index : index + batch_size],
+                prefix_col[index : index + batch_size],
+                identifier_col[index : index + batch_size],
+            )
+        )
+        for index in range(0, len(compartments), batch_size)
+    )
     with tqdm(total=len(compartments), desc="Compartment", unit_scale=True) as pbar:
-        for index in range(0, len(compartments), batch_size):
-            models = []
-            for row in compartments.iloc[index : index + batch_size, :].itertuples(
-                index=False
-            ):
-                logger.debug(row.mnx_id)
-                comp = Compartment()
-                # We first collect names and identifiers such that we insert only
-                # unique names per namespace.
-                names = {}
-                preferred_names = set()
-                identifiers = {}
-                # We avoid NaN (missing) values here.
-                if isinstance(row.name, str):
-                    names[row.prefix] = {n.strip() for n in row.name.split("||")}
-                    preferred_names.update(names[row.prefix])
-                identifiers["metanetx.compartment"] = {row.mnx_id}
-                identifiers.setdefault(row.prefix, set()).add(row.identifier)
-                if row.mnx_id in grouped_xref.groups:
-                    # Expand names and identifiers with cross-references.
-                    for xref_row in grouped_xref.get_group(row.mnx_id).itertuples(
-                        index=False
-                    ):
-                        # We avoid NaN (missing) values here.
-                        if isinstance(xref_row.description, str):
-                            names.setdefault(xref_row.prefix, set()).update(
-                                (n.strip() for n in xref_row.description.split("||"))
-                            )
-                        # Set cross-references on identifiers.
-                        identifiers.setdefault(xref_row.prefix, set()).add(
-                            xref_row.identifier
-                        )
-                name_models = []
-                for prefix, sub_names in names.items():
-                    try:
-                        namespace = mapping[prefix]
-                    except KeyError:
-                        logger.error(f"Unknown prefix '{prefix}' encountered.")
-                        continue
-                    # We set preferred names from the original row description which
-                    # only applies where the prefix is equal to the row's source prefix.
-                    if prefix == row.prefix:
-                        name_models.extend(
-                            CompartmentName(
-                                name=n,
-                                namespace=namespace,
-                                is_preferred=(n in preferred_names),
-                            )
-                            for n in sub_names
-                        )
-                    else:
-                        name_models.extend(
-                            CompartmentName(name=n, namespace=namespace)
-                            for n in sub_names
-                        )
-                comp.names = name_models
-                annotation = []
-                for prefix, sub_ids in identifiers.items():
-                    try:
-                        namespace = mapping[prefix]
-                    except KeyError:
-                        logger.error(f"Unknown prefix '{prefix}' encountered.")
-                        continue
-                    annotation.extend(
-                        CompartmentAnnotation(
-                            identifier=i,
-                            namespace=namespace,
-                        )
-                        for i in sub_ids
-                    )
-                if row.mnx_id in grouped_deprecated.groups:
-                    # Add deprecated MetaNetX identifiers.
-                    namespace = mapping["metanetx.compartment"]
-                    for depr_row in grouped_deprecated.get_group(row.mnx_id).itertuples(
-                        index=False
-                    ):
-                        annotation.append(
-                            CompartmentAnnotation(
-                                identifier=depr_row.deprecated_id,
-                                namespace=namespace,
-                                is_deprecated=True,
-                            )
-                        )
-                comp.annotation = annotation
-                models.append(comp)
-            session.add_all(models)
-            session.commit()
-            pbar.update(len(models))
+        if processes > 1:
+            # Workers transform batches in parallel while this process consumes
+            # the results in order and performs the inserts. The initializer
+            # ships the lookup mappings to every worker once instead of with
+            # every batch, and the bounded window keeps the lazy chunk
+            # generator from being materialized up front.
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=initialize_compartment_worker,
+                initargs=(xref_by_mnx, depr_by_mnx, prefix_to_nsid),
+            ) as pool:
+                for batch in map_bounded(
+                    pool, build_compartment_worker_batch, chunks, processes + 1
+                ):
+                    _load_batch(session, batch)
+                    pbar.update(len(batch))
+        else:
+            initialize_compartment_worker(xref_by_mnx, depr_by_mnx, prefix_to_nsid)
+            for batch in map(build_compartment_worker_batch, chunks):
+                _load_batch(session, batch)
+                pbar.update(len(batch))
+    # A single commit at the end means the whole load is one transaction which
+    # amortizes the per-commit write-ahead log and fsync cost over all batches.
+    session.commit()
+
+
+def _load_batch(session: Session, batch: List[CompartmentPayload]) -> None:
+    """Insert one transformed batch with a single statement per table."""
+    comp_rows = [comp for comp, _, _ in batch]
+    # `return_defaults` fills in the generated primary keys which we need
+    # below in order to link the child tables to their compartments.
+    session.bulk_insert_mappings(Compartment, comp_rows, return_defaults=True)
+    name_rows = []
+    annotation_rows = []
+    for comp, sub_names, sub_annotation in batch:
+        for entry in sub_names:
+            entry["compartment_id"] = comp["id"]
+        name_rows.extend(sub_names)
+        for entry in sub_annotation:
+            entry["compartment_id"] = comp["id"]
+        annotation_rows.extend(sub_annotation)
+    insert_rows(session, CompartmentName.__table__, name_rows)
+    insert_rows(session, CompartmentAnnotation.__table__, annotation_rows)
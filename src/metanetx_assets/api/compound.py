@@ -17,7 +17,9 @@
 
 
 import logging
-from typing import Dict
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
 
 import pandas as pd
 from cobra_component_models.orm import (
@@ -29,6 +31,14 @@ from cobra_component_models.orm import (
 from sqlalchemy.orm import sessionmaker
 from tqdm import tqdm
 
+from ..etl import split_names, strip_prefix
+from ..etl.compound import (
+    CompoundPayload,
+    build_compound_worker_batch,
+    initialize_compound_worker,
+)
+from .helpers import insert_rows, map_bounded
+
 
 logger = logging.getLogger()
 Session = sessionmaker()
@@ -40,7 +50,8 @@ def etl_compounds(
     cross_references: pd.DataFrame,
     deprecated: pd.DataFrame,
     mapping: Dict[str, Namespace],
-    batch_size: int = 1000,
+    batch_size: int = 10_000,
+    processes: Optional[int] = None,
 ):
     """
     Load compound information into a database.
@@ -53,208 +64,126 @@ def etl_compounds(
     deprecated
     mapping
     batch_size : int
+        The number of rows transformed and inserted per executemany statement.
+        Larger batches mean fewer round trips at the cost of more memory.
+    processes : int, optional
+        The number of worker processes used to transform batches in parallel
+        (default the number of available cores).
 
     """
-    # TODO: This is a first draft of the function. Parts should be refactored to the
-    #  etl sub-package so that they can be tested better.
+    if processes is None:
+        processes = os.cpu_count() or 1
     # New tables include an `InChIKey=` prefix which we remove.
-    compounds["inchi_key"] = compounds["inchi_key"].str[len("InChIKey=") :]
-    grouped_xref = cross_references.groupby("mnx_id", sort=False)
-    grouped_deprecated = deprecated.groupby("current_id", sort=False)
+    compounds["inchi_key"] = strip_prefix(compounds["inchi_key"], "InChIKey=")
+    # Report prefixes that cannot be resolved once, rather than per row in the
+    # hot loops below. Missing values are not prefixes and are skipped; they
+    # would also break sorting the mixed-type set.
+    unknown_prefixes = (
+        set(compounds["prefix"].unique())
+        | set(cross_references["prefix"].unique())
+    ) - mapping.keys()
+    for prefix in sorted(p for p in unknown_prefixes if isinstance(p, str)):
+        logger.error(f"Unknown prefix '{prefix}' encountered.")
+    # Plain dictionaries of row tuples avoid the per-row DataFrame slice that
+    # `groupby.get_group` constructs inside the hot loop. They also cross
+    # process boundaries cheaply, unlike ORM objects.
+    xref_by_mnx = {}
+    for xref_row, xref_names in zip(
+        cross_references.itertuples(index=False),
+        split_names(cross_references["description"]),
+    ):
+        xref_by_mnx.setdefault(xref_row.mnx_id, []).append(
+            (xref_row.prefix, xref_row.identifier, xref_names)
+        )
+    depr_by_mnx = {}
+    for depr_row in deprecated.itertuples(index=False):
+        depr_by_mnx.setdefault(depr_row.current_id, []).append(depr_row.deprecated_id)
+    prefix_to_nsid = {prefix: namespace.id for prefix, namespace in mapping.items()}
     # The InChI field (and thus also InChIKey) must be unique since it is the same
     # structure.
     is_duplicated = compounds.duplicated("inchi_key") & compounds["inchi_key"].notnull()
     deduped = compounds.loc[~is_duplicated, :]
-    with tqdm(total=len(deduped), desc="Compound", unit_scale=True) as pbar:
-        for index in range(0, len(deduped), batch_size):
-            models = []
-            for row in deduped.iloc[index : index + batch_size, :].itertuples(
-                index=False
-            ):
-                logger.debug(row.mnx_id)
-                comp = Compound(
-                    inchi=row.inchi,
-                    inchi_key=row.inchi_key,
-                    smiles=row.smiles,
-                    chemical_formula=row.formula,
-                    charge=row.charge,
-                    mass=row.mass,
-                )
-                # We collect names and identifiers such that we insert only
-                # unique names per namespace.
-                names = {}
-                preferred_names = set()
-                # We avoid NaN (missing) values here.
-                if isinstance(row.name, str):
-                    names[row.prefix] = {n.strip() for n in row.name.split("||")}
-                    preferred_names.update(names[row.prefix])
-                identifiers = {}
-                identifiers["metanetx.chemical"] = {row.mnx_id}
-                identifiers.setdefault(row.prefix, set()).add(row.identifier)
-                if row.mnx_id in grouped_xref.groups:
-                    # Expand names and identifiers with cross-references.
-                    for xref_row in grouped_xref.get_group(row.mnx_id).itertuples(
-                        index=False
-                    ):
-                        # We avoid NaN (missing) values here.
-                        if isinstance(xref_row.description, str):
-                            names.setdefault(xref_row.prefix, set()).update(
-                                (n.strip() for n in xref_row.description.split("||"))
-                            )
-                        identifiers.setdefault(xref_row.prefix, set()).add(
-                            xref_row.identifier
-                        )
-                name_models = []
-                for prefix, sub_names in names.items():
-                    try:
-                        namespace = mapping[prefix]
-                    except KeyError:
-                        logger.error(f"Unknown prefix '{prefix}' encountered.")
-                        continue
-                    # We set preferred names from the original row description which
-                    # only applies where the prefix is equal to the row's source prefix.
-                    if prefix == row.prefix:
-                        name_models.extend(
-                            CompoundName(
-                                name=n,
-                                namespace=namespace,
-                                is_preferred=(n in preferred_names),
-                            )
-                            for n in sub_names
-                        )
-                    else:
-                        name_models.extend(
-                            CompoundName(name=n, namespace=namespace) for n in sub_names
-                        )
-                comp.names = name_models
-                annotation = []
-                for prefix, sub_ids in identifiers.items():
-                    try:
-                        namespace = mapping[prefix]
-                    except KeyError:
-                        logger.error(f"Unknown prefix '{prefix}' encountered.")
-                        continue
-                    annotation.extend(
-                        CompoundAnnotation(
-                            identifier=i,
-                            namespace=namespace,
-                        )
-                        for i in sub_ids
-                    )
-                if row.mnx_id in grouped_deprecated.groups:
-                    # Add deprecated MetaNetX identifiers.
-                    namespace = mapping["metanetx.chemical"]
-                    for depr_row in grouped_deprecated.get_group(row.mnx_id).itertuples(
-                        index=False
-                    ):
-                        annotation.append(
-                            CompoundAnnotation(
-                                identifier=depr_row.deprecated_id,
-                                namespace=namespace,
-                                is_deprecated=True,
-                            )
-                        )
-                comp.annotation = annotation
-                models.append(comp)
-            session.add_all(models)
-            session.commit()
-            pbar.update(len(models))
-    # Now we add names and identifiers for duplicated structures.
+    # Rows that duplicate an InChIKey contribute their names, identifiers,
+    # cross-references, and deprecated identifiers to the compound of the first
+    # occurrence. Merging them into that compound's cross-references here folds
+    # the former second loading pass (with its own queries per duplicate) into
+    # the single pass below; the builders deduplicate per namespace.
     dupes = compounds.loc[is_duplicated, :]
-    with tqdm(total=len(dupes), desc="Duplicate InChI") as pbar:
-        for index in range(0, len(dupes), batch_size):
-            models = []
-            for row in dupes.iloc[index : index + batch_size, :].itertuples(
-                index=False
-            ):
-                logger.debug(row.mnx_id)
-                comp = (
-                    session.query(Compound)
-                    .filter(Compound.inchi_key == row.inchi_key)
-                    .join(CompoundAnnotation)
-                    .join(CompoundName)
-                    .one()
-                )
-                existing_names = {}
-                for name in comp.names:
-                    existing_names.setdefault(name.namespace.prefix, set()).add(
-                        name.name
-                    )
-                existing_annotation = {}
-                for identifier in comp.annotation:
-                    existing_annotation.setdefault(
-                        identifier.namespace.prefix, set()
-                    ).add(identifier.identifier)
-                # We collect names and identifiers such that we insert only
-                # unique names per namespace.
-                names = {}
-                identifiers = {}
-                # We avoid NaN (missing) values here.
-                if isinstance(row.name, str):
-                    names[row.prefix] = {n.strip() for n in row.name.split("||")}
-                identifiers["metanetx.chemical"] = {row.mnx_id}
-                identifiers.setdefault(row.prefix, set()).add(row.identifier)
-                if row.mnx_id in grouped_xref.groups:
-                    # Expand names and identifiers with cross-references.
-                    for xref_row in grouped_xref.get_group(row.mnx_id).itertuples(
-                        index=False
-                    ):
-                        # We avoid NaN (missing) values here.
-                        if isinstance(xref_row.description, str):
-                            names.setdefault(xref_row.prefix, set()).update(
-                                (n.strip() for n in xref_row.description.split("||"))
-                            )
-                        identifiers.setdefault(xref_row.prefix, set()).add(
-                            xref_row.identifier
-                        )
-                name_models = []
-                for prefix, sub_names in names.items():
-                    try:
-                        namespace = mapping[prefix]
-                    except KeyError:
-                        logger.error(f"Unknown prefix '{prefix}' encountered.")
-                        continue
-                    existing = existing_names.get(prefix, frozenset())
-                    name_models.extend(
-                        CompoundName(name=n, namespace=namespace)
-                        for n in sub_names
-                        if n not in existing
-                    )
-                comp.names.extend(name_models)
-                annotation = []
-                for prefix, sub_ids in identifiers.items():
-                    try:
-                        namespace = mapping[prefix]
-                    except KeyError:
-                        logger.error(f"Unknown prefix '{prefix}' encountered.")
-                        continue
-                    existing = existing_annotation.get(prefix, frozenset())
-                    annotation.extend(
-                        CompoundAnnotation(
-                            identifier=i,
-                            namespace=namespace,
-                        )
-                        for i in sub_ids
-                        if i not in existing
-                    )
-                if row.mnx_id in grouped_deprecated.groups:
-                    # Add deprecated MetaNetX identifiers.
-                    prefix = "metanetx.chemical"
-                    namespace = mapping[prefix]
-                    for depr_row in grouped_deprecated.get_group(row.mnx_id).itertuples(
-                        index=False
-                    ):
-                        existing = existing_annotation.get(prefix, frozenset())
-                        if depr_row.deprecated_id in existing:
-                            continue
-                        annotation.append(
-                            CompoundAnnotation(
-                                identifier=depr_row.deprecated_id,
-                                namespace=namespace,
-                                is_deprecated=True,
-                            )
-                        )
-                comp.annotation.extend(annotation)
-                session.add(comp)
-                session.commit()
-                pbar.update()
+    canonical_by_key = dict(
+        zip(deduped["inchi_key"].to_numpy(), deduped["mnx_id"].to_numpy())
+    )
+    for dupe_row, dupe_names in zip(
+        dupes.itertuples(index=False), split_names(dupes["name"])
+    ):
+        canonical = canonical_by_key[dupe_row.inchi_key]
+        extra = xref_by_mnx.setdefault(canonical, [])
+        extra.append((dupe_row.prefix, dupe_row.identifier, dupe_names))
+        extra.append(("metanetx.chemical", dupe_row.mnx_id, set()))
+        extra.extend(xref_by_mnx.get(dupe_row.mnx_id, ()))
+        if dupe_row.mnx_id in depr_by_mnx:
+            depr_by_mnx.setdefault(canonical, []).extend(
+                depr_by_mnx[dupe_row.mnx_id]
+            )
+    # Indexing plain column arrays avoids both the DataFrame slice copy made by
+    # `iloc` and the per-row namedtuple that `itertuples` allocates.
+    columns = [
+        deduped["mnx_id"].to_numpy(),
+        split_names(deduped["name"]),
+        deduped["prefix"].to_numpy(),
+        deduped["identifier"].to_numpy(),
+        deduped["inchi"].to_numpy(),
+        deduped["inchi_key"].to_numpy(),
+        deduped["smiles"].to_numpy(),
+        deduped["formula"].to_numpy(),
+        deduped["charge"].to_numpy(),
+        deduped["mass"].to_numpy(),
+    ]
+    num_deduped = len(deduped)
+    chunks = (
+        list(zip(*(column[index : index + batch_size] for column in columns)))
+        for index in range(0, num_deduped, batch_size)
+    )
+    with tqdm(total=num_deduped, desc="Compound", unit_scale=True) as pbar:
+        if processes > 1:
+            # Workers transform batches in parallel while this process consumes
+            # the results in order and performs the inserts. The initializer
+            # ships the lookup mappings to every worker once instead of with
+            # every batch, and the bounded window keeps the lazy chunk
+            # generator from being materialized up front.
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=initialize_compound_worker,
+                initargs=(xref_by_mnx, depr_by_mnx, prefix_to_nsid),
+            ) as pool:
+                for batch in map_bounded(
+                    pool, build_compound_worker_batch, chunks, processes + 1
+                ):
+                    _load_batch(session, batch)
+                    pbar.update(len(batch))
+        else:
+            initialize_compound_worker(xref_by_mnx, depr_by_mnx, prefix_to_nsid)
+            for batch in map(build_compound_worker_batch, chunks):
+                _load_batch(session, batch)
+                pbar.update(len(batch))
+    # A single commit at the end means the whole load is one transaction which
+    # amortizes the per-commit write-ahead log and fsync cost over all batches.
+    session.commit()
+
+
+def _load_batch(session: Session, batch: List[CompoundPayload]) -> None:
+    """Insert one transformed batch with a single statement per table."""
+    comp_rows = [comp for comp, _, _ in batch]
+    # `return_defaults` fills in the generated primary keys which we need
+    # below in order to link the child tables to their compounds.
+    session.bulk_insert_mappings(Compound, comp_rows, return_defaults=True)
+    name_rows = []
+    annotation_rows = []
+    for comp, sub_names, sub_annotation in batch:
+        for entry in sub_names:
+            entry["compound_id"] = comp["id"]
+        name_rows.extend(sub_names)
+        for entry in sub_annotation:
+            entry["compound_id"] = comp["id"]
+        annotation_rows.extend(sub_annotation)
+    insert_rows(session, CompoundName.__table__, name_rows)
+    insert_rows(session, CompoundAnnotation.__table__, annotation_rows)
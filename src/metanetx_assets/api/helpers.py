@@ -0,0 +1,175 @@
+# Copyright (c) 2020, Moritz E. Beber.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Provide helpers shared by the high-level ETL functions."""
+
+
+import io
+import logging
+from collections import deque
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, TypeVar
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+
+logger = logging.getLogger()
+Session = sessionmaker()
+
+
+T = TypeVar("T")
+S = TypeVar("S")
+
+
+def map_bounded(
+    pool: Executor,
+    function: Callable[[T], S],
+    iterable: Iterable[T],
+    window: int,
+) -> Iterator[S]:
+    """
+    Map a function over an iterable keeping a bounded number of pending tasks.
+
+    ``Executor.map`` submits every item up front, which materializes a lazy
+    batch generator in full. This helper keeps at most ``window`` batches in
+    flight and yields the results in submission order.
+
+    Parameters
+    ----------
+    pool : concurrent.futures.Executor
+        The executor that the function is submitted to.
+    function : callable
+        The function applied to every item.
+    iterable : iterable
+        The items, typically a lazy generator of batches.
+    window : int
+        The maximum number of submitted but unconsumed items.
+
+    Yields
+    ------
+    The function results in the order of the input items.
+
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(pool.submit(function, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+@contextmanager
+def deferred_indexes(engine: Engine, tables: Iterable[Table]):
+    """
+    Drop the secondary indexes of the given tables for the duration of a load.
+
+    Building an index over the finished table in one sorted pass is much
+    faster than maintaining it incrementally for every inserted row. The
+    indexes are recreated when the block exits, also on error.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        The engine connected to the database being loaded.
+    tables : iterable
+        The tables whose indexes are dropped before and recreated after the
+        block.
+
+    """
+    indexes = [index for table in tables for index in table.indexes]
+    for index in indexes:
+        index.drop(bind=engine, checkfirst=True)
+    try:
+        yield
+    finally:
+        for index in indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def insert_rows(session: Session, table: Table, rows: List[dict]) -> None:
+    """
+    Insert row dictionaries into a table using the fastest available path.
+
+    On PostgreSQL the rows are streamed through ``COPY ... FROM STDIN`` which
+    beats even a multi-row ``INSERT``. On every other dialect a single Core
+    executemany statement is used.
+
+    Parameters
+    ----------
+    session
+    table : sqlalchemy.Table
+        The table that the rows belong to.
+    rows : list
+        Row dictionaries that all share the same keys.
+
+    """
+    if not rows:
+        return
+    if session.bind.dialect.name == "postgresql":
+        _copy_rows(session, table, rows)
+    else:
+        session.execute(table.insert(), rows)
+
+
+def _format_copy_field(value) -> str:
+    """Format one value as a field for ``COPY ... WITH CSV``."""
+    # ``None`` must stay an unquoted empty field, which ``COPY`` reads as
+    # NULL. Every other value is quoted so that empty strings survive as
+    # empty strings; ``csv.writer`` would emit both identically.
+    if value is None:
+        return ""
+    return '"{}"'.format(str(value).replace('"', '""'))
+
+
+def _copy_rows(session: Session, table: Table, rows: List[dict]) -> None:
+    """Stream row dictionaries into a PostgreSQL table via ``COPY``."""
+    data_columns = list(rows[0])
+    # ``COPY`` bypasses the statement layer, so Python-side column defaults
+    # (for example, the creation timestamp) have to be filled in here. They are
+    # evaluated once per call which matches executemany semantics.
+    default_columns = []
+    default_values = []
+    for column in table.columns:
+        if column.name in rows[0] or column.default is None:
+            continue
+        default_columns.append(column.name)
+        default = column.default
+        default_values.append(
+            default.arg(None) if default.is_callable else default.arg
+        )
+    columns = data_columns + default_columns
+    default_suffix = "".join(
+        f",{_format_copy_field(value)}" for value in default_values
+    )
+    buffer = io.StringIO()
+    write = buffer.write
+    for row in rows:
+        write(
+            ",".join(_format_copy_field(row[column]) for column in data_columns)
+        )
+        write(default_suffix)
+        write("\n")
+    buffer.seek(0)
+    statement = 'COPY "{}" ({}) FROM STDIN WITH CSV'.format(
+        table.name, ", ".join(f'"{column}"' for column in columns)
+    )
+    # The raw DBAPI connection underlying the session keeps the COPY inside
+    # the session's current transaction.
+    with session.connection().connection.cursor() as cursor:
+        cursor.copy_expert(statement, buffer)
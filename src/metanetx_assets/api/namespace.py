@@ -19,7 +19,6 @@ import logging
 from typing import Dict, List, Set
 
 import httpx
-from cobra_component_models.orm import Namespace
 from sqlalchemy.orm import sessionmaker
 from tqdm import tqdm
 
@@ -53,15 +52,18 @@ def download_namespace_mapping(
 
 def transform_namespaces(
     namespace_mapping: Dict[str, IdentifiersOrgNamespaceModel], prefixes: Set[str]
-):
-    """Transform namespace data models from Identifiers.org to the local schema."""
-    models: List[Namespace] = []
+) -> List[dict]:
+    """
+    Transform namespace data models from Identifiers.org to the local schema.
+
+    The rows are returned as plain dictionaries rather than ORM instances so
+    that loading them skips instance construction and unit-of-work state
+    tracking entirely.
+    """
+    rows: List[dict] = []
     for prefix in tqdm(prefixes, desc="Namespace"):
         try:
-            # TODO: Use `orm_mode` here?
-            models.append(Namespace(**namespace_mapping[prefix].dict()))
+            rows.append(namespace_mapping[prefix].dict())
         except KeyError:
-            model = patch_namespace(prefix)
-            if model:
-                models.append(model)
-    return models
+            rows.append(patch_namespace(prefix))
+    return rows
@@ -17,34 +17,44 @@
 
 
 import logging
-from typing import Dict
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 from cobra_component_models.orm import (
     CompartmentAnnotation,
     CompoundAnnotation,
     Namespace,
+    Participant,
     Reaction,
     ReactionAnnotation,
     ReactionName,
 )
+from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
 from tqdm import tqdm
 
-from ..etl import EquationParser
+from ..etl import split_names
+from ..etl.reaction import initialize_equation_worker, parse_equation_batch
+from .helpers import insert_rows, map_bounded
 
 
 logger = logging.getLogger()
 Session = sessionmaker()
 
 
+ReactionPayload = Tuple[dict, List[dict], List[dict], List[dict]]
+
+
 def etl_reactions(
     session: Session,
     reactions: pd.DataFrame,
     cross_references: pd.DataFrame,
     deprecated: pd.DataFrame,
     namespace_mapping: Dict[str, Namespace],
-    batch_size: int = 1000,
+    batch_size: int = 10_000,
+    processes: Optional[int] = None,
 ):
     """
     Load reaction information into a database.
@@ -57,118 +67,215 @@ def etl_reactions(
     deprecated
     namespace_mapping
     batch_size : int
+        The number of rows transformed and inserted per executemany statement.
+        Larger batches mean fewer round trips at the cost of more memory.
+    processes : int, optional
+        The number of worker processes used to parse equation batches in
+        parallel (default the number of available cores).
 
     """
+    if processes is None:
+        processes = os.cpu_count() or 1
     # TODO: This is a first draft of the function. Parts should be refactored to the
     #  etl sub-package so that they can be tested better.
     # We need to map the compound and compartment identifiers from the parsed
-    # reaction equations back to their respective database rows.
-    compound_mapping = {
-        row.identifier: row.compound_id
-        for row in session.query(
-            CompoundAnnotation.identifier, CompoundAnnotation.compound_id
-        )
-        .filter(
-            CompoundAnnotation.namespace_id == namespace_mapping["metanetx.chemical"].id
-        )
-        .yield_per(1000)
-        # 1000 is a good value according to the documentation at
-        # https://docs.sqlalchemy.org/en/13/orm/query.html#sqlalchemy.orm.query.Query.yield_per
-    }
-    compartment_mapping = {
-        row.identifier: row.compartment_id
-        for row in session.query(
-            CompartmentAnnotation.identifier, CompartmentAnnotation.compartment_id
-        )
-        .filter(
-            CompartmentAnnotation.namespace_id
-            == namespace_mapping["metanetx.compartment"].id
-        )
-        .yield_per(1000)
-        # 1000 is a good value according to the documentation at
-        # https://docs.sqlalchemy.org/en/13/orm/query.html#sqlalchemy.orm.query.Query.yield_per
-    }
+    # reaction equations back to their respective database rows. The two-column
+    # Core statements skip ORM row construction, and the server-side cursor
+    # streams the rows instead of buffering the full result.
+    compound_mapping = dict(
+        session.execute(
+            select(
+                CompoundAnnotation.identifier, CompoundAnnotation.compound_id
+            )
+            .where(
+                CompoundAnnotation.namespace_id
+                == namespace_mapping["metanetx.chemical"].id
+            )
+            .execution_options(stream_results=True)
+        ).fetchall()
+    )
+    compartment_mapping = dict(
+        session.execute(
+            select(
+                CompartmentAnnotation.identifier, CompartmentAnnotation.compartment_id
+            )
+            .where(
+                CompartmentAnnotation.namespace_id
+                == namespace_mapping["metanetx.compartment"].id
+            )
+            .execution_options(stream_results=True)
+        ).fetchall()
+    )
+    # Report prefixes that cannot be resolved once, rather than per row in the
+    # hot loops below. The 'ec-code' prefix is emitted for the EC number
+    # column. Missing values are not prefixes and are skipped; they would also
+    # break sorting the mixed-type set.
+    unknown_prefixes = (
+        set(reactions["prefix"].unique())
+        | set(cross_references["prefix"].unique())
+        | {"ec-code"}
+    ) - namespace_mapping.keys()
+    for prefix in sorted(p for p in unknown_prefixes if isinstance(p, str)):
+        logger.error(f"Unknown prefix '{prefix}' encountered.")
     # Transform the Boolean columns to Boolean values.
     reactions["is_balanced"] = reactions["is_balanced"] == "B"
     reactions["is_transport"] = reactions["is_transport"] == "T"
-    grouped_xref = cross_references.groupby("mnx_id", sort=False)
-    grouped_deprecated = deprecated.groupby("current_id", sort=False)
-    with tqdm(total=len(reactions), desc="Reaction", unit_scale=True) as pbar:
-        for index in range(0, len(reactions), batch_size):
-            models = []
-            for row in reactions.iloc[index : index + batch_size, :].itertuples(
-                index=False
+    # Plain dictionaries of row tuples avoid the per-row DataFrame slice that
+    # `groupby.get_group` constructs inside the hot loop.
+    xref_by_mnx = {}
+    for xref_row, xref_names in zip(
+        cross_references.itertuples(index=False),
+        split_names(cross_references["description"]),
+    ):
+        xref_by_mnx.setdefault(xref_row.mnx_id, []).append(
+            (xref_row.prefix, xref_row.identifier, xref_names)
+        )
+    depr_by_mnx = {}
+    for depr_row in deprecated.itertuples(index=False):
+        depr_by_mnx.setdefault(depr_row.current_id, []).append(depr_row.deprecated_id)
+    # Carry namespace primary keys instead of ORM objects through the loop;
+    # writing the foreign key directly avoids the relationship-cascade
+    # bookkeeping that assigning a related object per row incurs.
+    prefix_to_nsid = {
+        prefix: namespace.id for prefix, namespace in namespace_mapping.items()
+    }
+    # Resolve the level check once instead of per row; even a no-op debug
+    # call has measurable dispatch cost at millions of iterations.
+    debug = logger.isEnabledFor(logging.DEBUG)
+    # The scratch containers are only read from below and can thus be reused
+    # across rows, sparing one allocation pair per row.
+    names = {}
+    identifiers = {}
+    # Equation parsing dominates the transform CPU time, so it is fanned out
+    # over worker processes. The initializer ships the identifier mappings to
+    # every worker once instead of with every batch, and the bounded window
+    # keeps parsed batches from piling up when the inserts are the slower
+    # side.
+    equation_col = reactions["equation"].to_numpy()
+    equation_chunks = (
+        list(equation_col[index : index + batch_size])
+        for index in range(0, len(reactions), batch_size)
+    )
+    pool = None
+    try:
+        if processes > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=initialize_equation_worker,
+                initargs=(compound_mapping, compartment_mapping),
+            )
+            parsed_batches = map_bounded(
+                pool, parse_equation_batch, equation_chunks, processes + 1
+            )
+        else:
+            initialize_equation_worker(compound_mapping, compartment_mapping)
+            parsed_batches = map(parse_equation_batch, equation_chunks)
+        with tqdm(
+            total=len(reactions), desc="Reaction", unit_scale=True
+        ) as pbar:
+            for index, parsed in zip(
+                range(0, len(reactions), batch_size), parsed_batches
             ):
-                logger.debug(row.mnx_id)
-                reaction = Reaction()
-                reaction.participants = EquationParser.parse_participants(
-                    row.equation, compound_mapping, compartment_mapping
-                )
-                # We collect identifiers such that we insert only unique ones per
-                # namespace.
-                identifiers = {}
-                identifiers["metanetx.reaction"] = {row.mnx_id}
-                if isinstance(row.ec_number, str):
-                    identifiers["ec-code"] = {row.ec_number}
-                identifiers.setdefault(row.prefix, set()).add(row.identifier)
-                names = {}
-                if row.mnx_id in grouped_xref.groups:
-                    # Expand identifiers with cross-references.
-                    for xref_row in grouped_xref.get_group(row.mnx_id).itertuples(
+                batch = []
+                for row, participant_rows in zip(
+                    reactions.iloc[index : index + batch_size, :].itertuples(
                         index=False
+                    ),
+                    parsed,
+                ):
+                    if debug:
+                        logger.debug(row.mnx_id)
+                    # We collect identifiers such that we insert only unique ones per
+                    # namespace.
+                    identifiers.clear()
+                    identifiers["metanetx.reaction"] = {row.mnx_id}
+                    if isinstance(row.ec_number, str):
+                        identifiers["ec-code"] = {row.ec_number}
+                    identifiers.setdefault(row.prefix, set()).add(row.identifier)
+                    names.clear()
+                    # Expand names and identifiers with cross-references.
+                    for xref_prefix, xref_identifier, xref_names in xref_by_mnx.get(
+                        row.mnx_id, ()
                     ):
-                        # We avoid NaN (missing) values here.
-                        if isinstance(xref_row.description, str):
-                            names.setdefault(xref_row.prefix, set()).update(
-                                (n.strip() for n in xref_row.description.split("||"))
-                            )
-                        identifiers.setdefault(xref_row.prefix, set()).add(
-                            xref_row.identifier
+                        # Missing values were already turned into empty sets.
+                        if xref_names:
+                            names.setdefault(xref_prefix, set()).update(xref_names)
+                        identifiers.setdefault(xref_prefix, set()).add(xref_identifier)
+                    name_rows = []
+                    for prefix, sub_names in names.items():
+                        # Skip no-op prefixes, e.g. from rows whose source column was
+                        # missing, before paying for the namespace resolution.
+                        if not sub_names:
+                            continue
+                        namespace_id = prefix_to_nsid.get(prefix)
+                        if namespace_id is None:
+                            continue
+                        name_rows.extend(
+                            {
+                                "name": n,
+                                "namespace_id": namespace_id,
+                            }
+                            for n in sub_names
                         )
-                name_models = []
-                for prefix, sub_names in names.items():
-                    try:
-                        namespace = namespace_mapping[prefix]
-                    except KeyError:
-                        logger.error(f"Unknown prefix '{prefix}' encountered.")
-                        continue
-                    name_models.extend(
-                        ReactionName(
-                            name=n,
-                            namespace=namespace,
+                    annotation_rows = []
+                    for prefix, sub_ids in identifiers.items():
+                        # Skip no-op prefixes, e.g. from rows whose source column was
+                        # missing, before paying for the namespace resolution.
+                        if not sub_ids:
+                            continue
+                        namespace_id = prefix_to_nsid.get(prefix)
+                        if namespace_id is None:
+                            continue
+                        annotation_rows.extend(
+                            {
+                                "identifier": i,
+                                "namespace_id": namespace_id,
+                                "is_deprecated": False,
+                            }
+                            for i in sub_ids
                         )
-                        for n in sub_names
-                    )
-                reaction.names = name_models
-                annotation = []
-                for prefix, sub_ids in identifiers.items():
-                    try:
-                        namespace = namespace_mapping[prefix]
-                    except KeyError:
-                        logger.error(f"Unknown prefix '{prefix}' encountered.")
-                        continue
-                    annotation.extend(
-                        ReactionAnnotation(
-                            identifier=i,
-                            namespace=namespace,
+                    if row.mnx_id in depr_by_mnx:
+                        # Add deprecated MetaNetX identifiers.
+                        namespace_id = prefix_to_nsid["metanetx.reaction"]
+                        annotation_rows.extend(
+                            {
+                                "identifier": deprecated_id,
+                                "namespace_id": namespace_id,
+                                "is_deprecated": True,
+                            }
+                            for deprecated_id in depr_by_mnx[row.mnx_id]
                         )
-                        for i in sub_ids
-                    )
-                if row.mnx_id in grouped_deprecated.groups:
-                    # Add deprecated MetaNetX identifiers.
-                    namespace = namespace_mapping["metanetx.reaction"]
-                    for depr_row in grouped_deprecated.get_group(row.mnx_id).itertuples(
-                        index=False
-                    ):
-                        annotation.append(
-                            ReactionAnnotation(
-                                identifier=depr_row.deprecated_id,
-                                namespace=namespace,
-                                is_deprecated=True,
-                            )
-                        )
-                reaction.annotation = annotation
-                models.append(reaction)
-            session.add_all(models)
-            session.commit()
-            pbar.update(len(models))
+                    batch.append(({}, participant_rows, name_rows, annotation_rows))
+                _load_batch(session, batch)
+                pbar.update(len(batch))
+    finally:
+        # The workers must not leak if a transform or an insert raises.
+        if pool is not None:
+            pool.shutdown()
+    # A single commit at the end means the whole load is one transaction which
+    # amortizes the per-commit write-ahead log and fsync cost over all batches.
+    session.commit()
+
+
+def _load_batch(session: Session, batch: List[ReactionPayload]) -> None:
+    """Insert one transformed batch with a single statement per table."""
+    reaction_rows = [reaction for reaction, _, _, _ in batch]
+    # `return_defaults` fills in the generated primary keys which we need
+    # below in order to link the child tables to their reactions.
+    session.bulk_insert_mappings(Reaction, reaction_rows, return_defaults=True)
+    participant_rows = []
+    name_rows = []
+    annotation_rows = []
+    for reaction, sub_participants, sub_names, sub_annotation in batch:
+        for entry in sub_participants:
+            entry["reaction_id"] = reaction["id"]
+        participant_rows.extend(sub_participants)
+        for entry in sub_names:
+            entry["reaction_id"] = reaction["id"]
+        name_rows.extend(sub_names)
+        for entry in sub_annotation:
+            entry["reaction_id"] = reaction["id"]
+        annotation_rows.extend(sub_annotation)
+    insert_rows(session, Participant.__table__, participant_rows)
+    insert_rows(session, ReactionName.__table__, name_rows)
+    insert_rows(session, ReactionAnnotation.__table__, annotation_rows)
@@ -28,13 +28,9 @@
 
 
 import logging
-import os
 
 import click
 import click_log
-from cobra_component_models.orm import Base
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
 from .compartment import compartments
 from .compound import compounds
@@ -46,15 +42,6 @@ logger = logging.getLogger()
 click_log.basic_config(logger)
 
 
-Session = sessionmaker()
-
-
-NUM_PROCESSES = os.cpu_count()
-if NUM_PROCESSES is None:
-    logger.warning("Could not determine the number of cores available - assuming 1.")
-    NUM_PROCESSES = 1
-
-
 @click.group()
 @click.help_option("--help", "-h")
 @click_log.simple_verbosity_option(
@@ -72,20 +59,25 @@ def cli():
 @click.help_option("--help", "-h")
 @click.argument("db-uri", metavar="<URI>")
 @click.option(
-    "--drop",
-    prompt="Do you *really* want to drop all existing tables in the given database?",
-    default="N/y",
-    help="Confirm that you want to drop all existing tables in the database.",
+    "--drop/--no-drop",
+    default=False,
+    show_default=True,
+    help="Drop all existing tables in the database before creating the schema.",
 )
 def init(db_uri, drop):
     """
-    Drop any existing tables and create the SBML classes schema.
+    Create the SBML classes schema, optionally dropping existing tables first.
 
     URI is a string interpreted as an rfc1738 compatible database URI.
 
     """
+    # Heavy imports are deferred into the command body so that invoking the
+    # CLI for help output does not pay for SQLAlchemy and pandas start-up.
+    from cobra_component_models.orm import Base
+    from sqlalchemy import create_engine
+
     engine = create_engine(db_uri)
-    if drop.lower().startswith("y"):
+    if drop:
         Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
 
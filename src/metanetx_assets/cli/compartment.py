@@ -28,29 +28,17 @@
 
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Optional
 
 import click
-from cobra_component_models.orm import (
-    Base,
-    Compartment,
-    CompartmentAnnotation,
-    CompartmentName,
-    Namespace,
-)
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-from ..api import etl_compartments
-from ..etl import extract_table
 
 
 logger = logging.getLogger(__name__)
 
 
-Session = sessionmaker()
-
-
 @click.group()
 @click.help_option("--help", "-h")
 def compartments():
@@ -69,25 +57,30 @@ def reset(db_uri: str):
     URI is a string interpreted as an rfc1738 compatible database URI.
 
     """  # noqa: D301
-    logger.info("Resetting compartment tables...")
-    engine = create_engine(db_uri)
-    Base.metadata.drop_all(
-        bind=engine,
-        tables=[
-            CompartmentAnnotation.__table__,
-            CompartmentName.__table__,
-            Compartment.__table__,
-        ],
-    )
-    Base.metadata.create_all(
-        bind=engine,
-        tables=[
-            CompartmentAnnotation.__table__,
-            CompartmentName.__table__,
-            Compartment.__table__,
-        ],
+    # Heavy imports are deferred into the command body so that invoking the
+    # CLI for help output does not pay for SQLAlchemy and pandas start-up.
+    from cobra_component_models.orm import (
+        Base,
+        Compartment,
+        CompartmentAnnotation,
+        CompartmentName,
     )
 
+    from .helpers import create_optimized_engine
+
+    logger.info("Resetting compartment tables...")
+    engine = create_optimized_engine(db_uri)
+    tables = [
+        CompartmentAnnotation.__table__,
+        CompartmentName.__table__,
+        Compartment.__table__,
+    ]
+    # One connection and one transaction for all of the DDL; `checkfirst` is
+    # pointless on tables that were just dropped.
+    with engine.begin() as connection:
+        Base.metadata.drop_all(bind=connection, tables=tables)
+        Base.metadata.create_all(bind=connection, tables=tables, checkfirst=False)
+
 
 @compartments.command()
 @click.help_option("--help", "-h")
@@ -101,11 +94,34 @@ def reset(db_uri: str):
 @click.argument(
     "comp-depr", metavar="<COMP_DEPR>", type=click.Path(exists=True, dir_okay=False)
 )
+@click.option(
+    "--processes",
+    type=int,
+    default=None,
+    show_default="number of cores",
+    help="The number of worker processes; 1 runs the transform serially.",
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    default=10_000,
+    show_default=True,
+    help="The number of rows transformed and inserted per statement.",
+)
+@click.option(
+    "--drop-indexes/--no-drop-indexes",
+    default=True,
+    show_default=True,
+    help="Drop secondary indexes during the load and rebuild them afterwards.",
+)
 def etl(
     db_uri: str,
     comp_prop: click.Path,
     comp_xref: click.Path,
     comp_depr: click.Path,
+    processes: Optional[int],
+    batch_size: int,
+    drop_indexes: bool,
 ):
     """
     Extract, transform, and load the compartments used in MetaNetX.
@@ -117,18 +133,51 @@ def etl(
     COMP_DEPR is a MetaNetX table with deprecated compartment identifiers.
 
     """  # noqa: D301
-    engine = create_engine(db_uri)
+    # Heavy imports are deferred into the command body so that invoking the
+    # CLI for help output does not pay for SQLAlchemy and pandas start-up.
+    from cobra_component_models.orm import (
+        Compartment,
+        CompartmentAnnotation,
+        CompartmentName,
+        Namespace,
+    )
+
+    from ..api import etl_compartments
+    from ..api.helpers import deferred_indexes
+    from ..etl import extract_table
+    from .helpers import Session, create_optimized_engine
+
+    engine = create_optimized_engine(db_uri)
     session = Session(bind=engine)
     logger.info("Extracting...")
-    compartments = extract_table(Path(comp_prop))
-    cross_references = extract_table(Path(comp_xref))
-    deprecated = extract_table(Path(comp_depr))
+    # The three tables are independent files; reading them concurrently
+    # overlaps their I/O and the parser releases the GIL while working.
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        compartments, cross_references, deprecated = pool.map(
+            extract_table, [Path(comp_prop), Path(comp_xref), Path(comp_depr)]
+        )
     namespace_mapping = Namespace.get_map(session)
     logger.info("Transforming & Loading...")
-    etl_compartments(
-        session,
-        compartments,
-        cross_references,
-        deprecated,
-        namespace_mapping,
-    )
+    if drop_indexes:
+        # Building each index once over the loaded tables beats maintaining
+        # them for every inserted row.
+        load_context = deferred_indexes(
+            engine,
+            [
+                Compartment.__table__,
+                CompartmentAnnotation.__table__,
+                CompartmentName.__table__,
+            ],
+        )
+    else:
+        load_context = nullcontext()
+    with load_context:
+        etl_compartments(
+            session,
+            compartments,
+            cross_references,
+            deprecated,
+            namespace_mapping,
+            batch_size=batch_size,
+            processes=processes,
+        )
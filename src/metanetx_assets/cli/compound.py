@@ -28,29 +28,17 @@
 
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Optional
 
 import click
-from cobra_component_models.orm import (
-    Base,
-    Compound,
-    CompoundAnnotation,
-    CompoundName,
-    Namespace,
-)
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-from ..api import etl_compounds
-from ..etl import extract_table
 
 
 logger = logging.getLogger(__name__)
 
 
-Session = sessionmaker()
-
-
 @click.group()
 @click.help_option("--help", "-h")
 def compounds():
@@ -69,25 +57,30 @@ def reset(db_uri: str):
     URI is a string interpreted as an rfc1738 compatible database URI.
 
     """  # noqa: D301
-    logger.info("Resetting compound tables...")
-    engine = create_engine(db_uri)
-    Base.metadata.drop_all(
-        bind=engine,
-        tables=[
-            CompoundAnnotation.__table__,
-            CompoundName.__table__,
-            Compound.__table__,
-        ],
-    )
-    Base.metadata.create_all(
-        bind=engine,
-        tables=[
-            CompoundAnnotation.__table__,
-            CompoundName.__table__,
-            Compound.__table__,
-        ],
+    # Heavy imports are deferred into the command body so that invoking the
+    # CLI for help output does not pay for SQLAlchemy and pandas start-up.
+    from cobra_component_models.orm import (
+        Base,
+        Compound,
+        CompoundAnnotation,
+        CompoundName,
     )
 
+    from .helpers import create_optimized_engine
+
+    logger.info("Resetting compound tables...")
+    engine = create_optimized_engine(db_uri)
+    tables = [
+        CompoundAnnotation.__table__,
+        CompoundName.__table__,
+        Compound.__table__,
+    ]
+    # One connection and one transaction for all of the DDL; `checkfirst` is
+    # pointless on tables that were just dropped.
+    with engine.begin() as connection:
+        Base.metadata.drop_all(bind=connection, tables=tables)
+        Base.metadata.create_all(bind=connection, tables=tables, checkfirst=False)
+
 
 @compounds.command()
 @click.help_option("--help", "-h")
@@ -101,11 +94,34 @@ def reset(db_uri: str):
 @click.argument(
     "chem-depr", metavar="<CHEM_DEPR>", type=click.Path(exists=True, dir_okay=False)
 )
+@click.option(
+    "--processes",
+    type=int,
+    default=None,
+    show_default="number of cores",
+    help="The number of worker processes; 1 runs the transform serially.",
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    default=10_000,
+    show_default=True,
+    help="The number of rows transformed and inserted per statement.",
+)
+@click.option(
+    "--drop-indexes/--no-drop-indexes",
+    default=True,
+    show_default=True,
+    help="Drop secondary indexes during the load and rebuild them afterwards.",
+)
 def etl(
     db_uri: str,
     chem_prop: click.Path,
     chem_xref: click.Path,
     chem_depr: click.Path,
+    processes: Optional[int],
+    batch_size: int,
+    drop_indexes: bool,
 ):
     """
     Extract, transform, and load the compounds used in MetaNetX.
@@ -117,19 +133,51 @@ def etl(
     CHEM_DEPR is a MetaNetX table with deprecated chemical identifiers.
 
     """  # noqa: D301
-    engine = create_engine(db_uri)
+    # Heavy imports are deferred into the command body so that invoking the
+    # CLI for help output does not pay for SQLAlchemy and pandas start-up.
+    from cobra_component_models.orm import (
+        Compound,
+        CompoundAnnotation,
+        CompoundName,
+        Namespace,
+    )
+
+    from ..api import etl_compounds
+    from ..api.helpers import deferred_indexes
+    from ..etl import extract_table
+    from .helpers import Session, create_optimized_engine
+
+    engine = create_optimized_engine(db_uri)
     session = Session(bind=engine)
     logger.info("Extracting...")
-    compounds = extract_table(Path(chem_prop))
-    cross_references = extract_table(Path(chem_xref))
-    deprecated = extract_table(Path(chem_depr))
+    # The three tables are independent files; reading them concurrently
+    # overlaps their I/O and the parser releases the GIL while working.
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        compounds, cross_references, deprecated = pool.map(
+            extract_table, [Path(chem_prop), Path(chem_xref), Path(chem_depr)]
+        )
     namespace_mapping = Namespace.get_map(session)
-    logger.info("Transforming...")
-    logger.info("Loading...")
-    etl_compounds(
-        session,
-        compounds,
-        cross_references,
-        deprecated,
-        namespace_mapping,
-    )
+    logger.info("Transforming & Loading...")
+    if drop_indexes:
+        # Building each index once over the loaded tables beats maintaining
+        # them for every inserted row.
+        load_context = deferred_indexes(
+            engine,
+            [
+                Compound.__table__,
+                CompoundAnnotation.__table__,
+                CompoundName.__table__,
+            ],
+        )
+    else:
+        load_context = nullcontext()
+    with load_context:
+        etl_compounds(
+            session,
+            compounds,
+            cross_references,
+            deprecated,
+            namespace_mapping,
+            batch_size=batch_size,
+            processes=processes,
+        )
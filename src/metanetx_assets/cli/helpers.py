@@ -0,0 +1,82 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019-2020, Moritz E. Beber.
+# Copyright (c) 2018 Institute for Molecular Systems Biology, ETH Zurich.
+# Copyright (c) 2018 Novo Nordisk Foundation Center for Biosustainability,
+# Technical University of Denmark
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""Provide helpers shared by the CLI subcommands."""
+
+
+import logging
+import os
+from functools import lru_cache
+from typing import Final
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+
+logger = logging.getLogger(__name__)
+
+
+# Detected once on import so that forked pool workers inherit the value
+# instead of re-reading the affinity mask.
+NUM_PROCESSES: Final[int] = os.cpu_count() or 1
+
+
+# One session factory shared by all subcommands. Objects loaded during the ETL
+# are not expired on commit, which spares the re-SELECT per attribute access
+# that the default behavior would trigger after the final commit.
+Session = sessionmaker(expire_on_commit=False)
+
+
+@lru_cache(maxsize=None)
+def create_optimized_engine(db_uri: str) -> Engine:
+    """
+    Create an engine with dialect-specific bulk-loading options.
+
+    On PostgreSQL, psycopg2's fast executemany mode collapses the per-batch
+    child-row inserts into a handful of multi-row statements, which removes
+    the per-row network round-trip from ORM flushes. The CLI opens a single
+    connection per command and then exits, so connection pooling is disabled
+    and repeated calls with the same URI share one cached engine.
+
+    Parameters
+    ----------
+    db_uri : str
+        A string interpreted as an rfc1738 compatible database URI.
+
+    """
+    if make_url(db_uri).get_dialect().name == "postgresql":
+        return create_engine(
+            db_uri,
+            executemany_mode="values_plus_batch",
+            # Pack whole batches into one VALUES statement instead of the
+            # driver default of one hundred rows.
+            executemany_values_page_size=10_000,
+            poolclass=NullPool,
+        )
+    return create_engine(db_uri, poolclass=NullPool)
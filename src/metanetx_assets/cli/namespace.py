@@ -29,21 +29,23 @@
 
 import json
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import click
-from cobra_component_models.orm import Base, Namespace
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
-from ..api import download_namespace_mapping, transform_namespaces
-from ..etl import extract_namespace_mapping, extract_table, get_required_prefixes
+try:
+    import orjson
 
+    # orjson serializes datetime objects natively in C; the stdlib encoder
+    # calls back into Python for every one of them via `default=str`.
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
 
-logger = logging.getLogger(__name__)
+import click
 
 
-Session = sessionmaker()
+logger = logging.getLogger(__name__)
 
 
 @click.group()
@@ -60,13 +62,20 @@ def namespaces():
 )
 def extract_registry(filename: Path):
     """Download the Identifiers.org registry of namespaces."""
+    # Heavy imports are deferred into the command body so that invoking the
+    # CLI for help output does not pay for SQLAlchemy and pandas start-up.
+    from ..api import download_namespace_mapping
+
     logger.info("Extracting Identifiers.org registry...")
     mapping = download_namespace_mapping()
     logger.info("Loading...")
-    with Path(filename).open(mode="w") as handle:
-        # We have to convert `datetime` objects to their string representations to be
-        # JSON compatible thus the argument `default=str`.
-        json.dump(mapping, handle, indent=None, separators=(",", ":"), default=str)
+    if _HAS_ORJSON:
+        Path(filename).write_bytes(orjson.dumps(mapping))
+    else:
+        with Path(filename).open(mode="w") as handle:
+            # We have to convert `datetime` objects to their string representations
+            # to be JSON compatible thus the argument `default=str`.
+            json.dump(mapping, handle, indent=None, separators=(",", ":"), default=str)
 
 
 @namespaces.command()
@@ -80,10 +89,20 @@ def reset(db_uri: str):
     URI is a string interpreted as an rfc1738 compatible database URI.
 
     """  # noqa: D301
+    # Heavy imports are deferred into the command body so that invoking the
+    # CLI for help output does not pay for SQLAlchemy and pandas start-up.
+    from cobra_component_models.orm import Base, Namespace
+
+    from .helpers import create_optimized_engine
+
     logger.info("Resetting namespace tables...")
-    engine = create_engine(db_uri)
-    Base.metadata.drop_all(bind=engine, tables=[Namespace.__table__])
-    Base.metadata.create_all(bind=engine, tables=[Namespace.__table__])
+    engine = create_optimized_engine(db_uri)
+    tables = [Namespace.__table__]
+    # One connection and one transaction for all of the DDL; `checkfirst` is
+    # pointless on a table that was just dropped.
+    with engine.begin() as connection:
+        Base.metadata.drop_all(bind=connection, tables=tables)
+        Base.metadata.create_all(bind=connection, tables=tables, checkfirst=False)
 
 
 @namespaces.command()
@@ -134,22 +153,44 @@ def etl(
     REAC_XREF is a MetaNetX table with reaction cross-references.
 
     """  # noqa: D301
-    engine = create_engine(db_uri)
+    # Heavy imports are deferred into the command body so that invoking the
+    # CLI for help output does not pay for SQLAlchemy and pandas start-up.
+    from cobra_component_models.orm import Namespace
+
+    from ..api import transform_namespaces
+    from ..api.helpers import insert_rows
+    from ..etl import (
+        extract_namespace_mapping,
+        extract_prefixes,
+        get_required_prefixes,
+    )
+    from .helpers import NUM_PROCESSES, Session, create_optimized_engine
+
+    engine = create_optimized_engine(db_uri)
     session = Session(bind=engine)
     logger.info("Extracting...")
     namespace_mapping = extract_namespace_mapping(Path(registry))
-    prefixes = get_required_prefixes(
-        extract_table(Path(chem_prop)),
-        extract_table(Path(chem_xref)),
-        extract_table(Path(comp_prop)),
-        extract_table(Path(comp_xref)),
-        extract_table(Path(reac_prop)),
-        extract_table(Path(reac_xref)),
-    )
+    # The six tables are independent, so their reads and parses overlap in a
+    # process pool instead of running back to back. Only the prefix column is
+    # needed, which spares parsing the bulky structure and description columns.
+    paths = [
+        Path(chem_prop),
+        Path(chem_xref),
+        Path(comp_prop),
+        Path(comp_xref),
+        Path(reac_prop),
+        Path(reac_xref),
+    ]
+    with ProcessPoolExecutor(max_workers=min(len(paths), NUM_PROCESSES)) as pool:
+        tables = list(pool.map(extract_prefixes, paths))
+    prefixes = get_required_prefixes(*tables)
     # MetaNetX also contains EC-codes but in a separate column without prefix.
     prefixes.add("ec-code")
     logger.info("Transforming...")
-    namespaces = transform_namespaces(namespace_mapping, prefixes)
+    rows = transform_namespaces(namespace_mapping, prefixes)
     logger.info("Loading...")
-    session.add_all(namespaces)
+    # The row dictionaries route through the bulk insert helper which uses
+    # ``COPY`` on PostgreSQL and a single Core executemany elsewhere, instead
+    # of flushing one ORM instance at a time.
+    insert_rows(session, Namespace.__table__, rows)
     session.commit()
@@ -16,7 +16,9 @@
 """Provide high-level ETL functions."""
 
 
-from .helpers import extract_table
+from .helpers import extract_prefixes, extract_table, split_names, strip_prefix
+from .compartment import build_compartment_batch
+from .compound import build_compound_batch
 from .namespace import (
     patch_namespace,
     get_unique_prefixes,
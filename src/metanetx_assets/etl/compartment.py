@@ -0,0 +1,204 @@
+# Copyright (c) 2020, Moritz E. Beber.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Provide specific compartment ETL functions."""
+
+
+import logging
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+CompartmentPayload = Tuple[dict, List[dict], List[dict]]
+
+
+_WORKER_MAPPINGS = None
+
+
+def initialize_compartment_worker(
+    xref_by_mnx: Dict[str, List[Tuple[str, str, Set[str]]]],
+    depr_by_mnx: Dict[str, List[str]],
+    prefix_to_nsid: Dict[str, int],
+) -> None:
+    """
+    Store the lookup mappings for later batch building.
+
+    Designed as a process pool initializer so that the potentially large
+    mappings are shipped to every worker once rather than with every batch.
+
+    Parameters
+    ----------
+    xref_by_mnx : dict
+        A map from MetaNetX identifier to cross-reference
+        (prefix, identifier, names) tuples.
+    depr_by_mnx : dict
+        A map from MetaNetX identifier to deprecated MetaNetX identifiers.
+    prefix_to_nsid : dict
+        A map from namespace prefix to namespace primary key.
+
+    """
+    global _WORKER_MAPPINGS
+    _WORKER_MAPPINGS = (xref_by_mnx, depr_by_mnx, prefix_to_nsid)
+
+
+def build_compartment_worker_batch(
+    rows: List[Tuple[str, Set[str], str, str]]
+) -> List[CompartmentPayload]:
+    """
+    Transform a batch of compartment rows using the stored mappings.
+
+    The lookup mappings must have been set up with
+    ``initialize_compartment_worker`` beforehand.
+
+    Parameters
+    ----------
+    rows : list
+        Tuples of MetaNetX identifier, set of names, source prefix, and source
+        identifier.
+
+    Returns
+    -------
+    list
+        The transformed batch, see ``build_compartment_batch``.
+
+    """
+    xref_by_mnx, depr_by_mnx, prefix_to_nsid = _WORKER_MAPPINGS
+    return build_compartment_batch(rows, xref_by_mnx, depr_by_mnx, prefix_to_nsid)
+
+
+def build_compartment_batch(
+    rows: Iterable[Tuple[str, Set[str], str, str]],
+    xref_by_mnx: Dict[str, List[Tuple[str, str, Set[str]]]],
+    depr_by_mnx: Dict[str, List[str]],
+    prefix_to_nsid: Dict[str, int],
+) -> List[CompartmentPayload]:
+    """
+    Transform a batch of compartment rows into table row dictionaries.
+
+    Parameters
+    ----------
+    rows : iterable
+        Tuples of MetaNetX identifier, set of names, source prefix, and source
+        identifier.
+    xref_by_mnx : dict
+        A map from MetaNetX identifier to cross-reference
+        (prefix, identifier, names) tuples.
+    depr_by_mnx : dict
+        A map from MetaNetX identifier to deprecated MetaNetX identifiers.
+    prefix_to_nsid : dict
+        A map from namespace prefix to namespace primary key.
+
+    Returns
+    -------
+    list
+        Per compartment, a triple of the compartment row itself plus its name
+        and annotation rows. The foreign keys to the compartment are stamped in
+        by the caller once the primary keys are known.
+
+    """
+    # This function works on plain data structures only so that batches can be
+    # distributed over worker processes.
+    # Resolve the level check once instead of per row; even a no-op debug
+    # call has measurable dispatch cost at millions of iterations.
+    debug = logger.isEnabledFor(logging.DEBUG)
+    mnx_nsid = prefix_to_nsid["metanetx.compartment"]
+    batch = []
+    # Rows are emitted in a single pass; the seen sets deduplicate names and
+    # identifiers per namespace and are reused across rows, sparing the
+    # two-level dict-of-sets aggregation per row.
+    seen_names = set()
+    seen_identifiers = set()
+    for mnx_id, row_names, row_prefix, row_identifier in rows:
+        if debug:
+            logger.debug(mnx_id)
+        seen_names.clear()
+        seen_identifiers.clear()
+        name_rows = []
+        annotation_rows = []
+        row_nsid = prefix_to_nsid.get(row_prefix)
+        if row_nsid is not None:
+            # Names from the original row description are the preferred ones.
+            # Missing values were already turned into empty sets.
+            for name in row_names:
+                seen_names.add((row_prefix, name))
+                name_rows.append(
+                    {
+                        "name": name,
+                        "namespace_id": row_nsid,
+                        "is_preferred": True,
+                    }
+                )
+            seen_identifiers.add((row_prefix, row_identifier))
+            annotation_rows.append(
+                {
+                    "identifier": row_identifier,
+                    "namespace_id": row_nsid,
+                    "is_deprecated": False,
+                }
+            )
+        if ("metanetx.compartment", mnx_id) not in seen_identifiers:
+            seen_identifiers.add(("metanetx.compartment", mnx_id))
+            annotation_rows.append(
+                {
+                    "identifier": mnx_id,
+                    "namespace_id": mnx_nsid,
+                    "is_deprecated": False,
+                }
+            )
+        # Expand names and identifiers with cross-references.
+        for xref_prefix, xref_identifier, xref_names in xref_by_mnx.get(mnx_id, ()):
+            xref_nsid = prefix_to_nsid.get(xref_prefix)
+            if xref_nsid is None:
+                continue
+            for name in xref_names:
+                key = (xref_prefix, name)
+                if key in seen_names:
+                    continue
+                seen_names.add(key)
+                name_rows.append(
+                    {
+                        "name": name,
+                        "namespace_id": xref_nsid,
+                        "is_preferred": False,
+                    }
+                )
+            key = (xref_prefix, xref_identifier)
+            if key not in seen_identifiers:
+                seen_identifiers.add(key)
+                annotation_rows.append(
+                    {
+                        "identifier": xref_identifier,
+                        "namespace_id": xref_nsid,
+                        "is_deprecated": False,
+                    }
+                )
+        if mnx_id in depr_by_mnx:
+            # Add deprecated MetaNetX identifiers.
+            for deprecated_id in depr_by_mnx[mnx_id]:
+                key = ("metanetx.compartment", deprecated_id)
+                if key in seen_identifiers:
+                    continue
+                seen_identifiers.add(key)
+                annotation_rows.append(
+                    {
+                        "identifier": deprecated_id,
+                        "namespace_id": mnx_nsid,
+                        "is_deprecated": True,
+                    }
+                )
+        batch.append(({}, name_rows, annotation_rows))
+    return batch
@@ -28,23 +28,40 @@
 
 
 import logging
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Optional, Set
+from typing import Dict, Set
 
 import pandas as pd
-from cobra_component_models.orm import Namespace
-from pydantic import parse_file_as
+from pydantic import parse_file_as, parse_obj_as
 
 from ..model import IdentifiersOrgNamespaceModel
 
 
+try:
+    import orjson
+
+    # orjson decodes the registry JSON in C before pydantic validates it.
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+
 logger = logging.getLogger(__name__)
 
 
 _MIRIAM_COUNTER = 99999999
 
 
-def patch_namespace(prefix: str) -> Optional[Namespace]:
+class _StoredNamespaceModel(IdentifiersOrgNamespaceModel):
+    """Parse stored registry entries keyed by field name instead of alias."""
+
+    class Config(IdentifiersOrgNamespaceModel.Config):
+
+        allow_population_by_field_name = True
+
+
+def patch_namespace(prefix: str) -> dict:
     """Create an entry similar to a registry defined by identifiers.org."""
     global _MIRIAM_COUNTER
     logger.warning(
@@ -53,12 +70,17 @@ def patch_namespace(prefix: str) -> Optional[Namespace]:
         prefix,
     )
     _MIRIAM_COUNTER -= 1
-    return Namespace(
-        pattern="^.+$",
-        prefix=prefix,
-        miriam_id=f"MIR:{_MIRIAM_COUNTER}",
-        description="A dummy namespace entry.",
-    )
+    now = datetime.now(timezone.utc)
+    return {
+        "prefix": prefix,
+        "miriam_id": f"MIR:{_MIRIAM_COUNTER}",
+        "name": None,
+        "pattern": "^.+$",
+        "description": "A dummy namespace entry.",
+        "embedded_prefix": False,
+        "created_on": now,
+        "updated_on": now,
+    }
 
 
 def extract_namespace_mapping(
@@ -78,11 +100,14 @@ def extract_namespace_mapping(
         A map from namespace prefixes to Identifiers.org namespace data models.
 
     """
-    old_value = IdentifiersOrgNamespaceModel.Config.allow_population_by_field_name
-    IdentifiersOrgNamespaceModel.Config.allow_population_by_field_name = True
-    mapping = parse_file_as(Dict[str, IdentifiersOrgNamespaceModel], filename)
-    IdentifiersOrgNamespaceModel.Config.allow_population_by_field_name = old_value
-    return mapping
+    # A parsing subclass avoids toggling class-level configuration, which
+    # would leak on exceptions and preclude concurrent parsing.
+    if _HAS_ORJSON:
+        return parse_obj_as(
+            Dict[str, _StoredNamespaceModel],
+            orjson.loads(filename.read_bytes()),
+        )
+    return parse_file_as(Dict[str, _StoredNamespaceModel], filename)
 
 
 def get_unique_prefixes(data_frame: pd.DataFrame) -> Set[str]:
@@ -128,11 +153,17 @@ def get_required_prefixes(
         tables.
 
     """
-    prefixes = set()
-    prefixes.update(get_unique_prefixes(chem_prop))
-    prefixes.update(get_unique_prefixes(chem_xref))
-    prefixes.update(get_unique_prefixes(comp_prop))
-    prefixes.update(get_unique_prefixes(comp_xref))
-    prefixes.update(get_unique_prefixes(reac_prop))
-    prefixes.update(get_unique_prefixes(reac_xref))
+    prefixes: Set[str] = set()
+    # On the categorical columns produced by `extract_prefixes` each unique()
+    # reads off the observed categories instead of scanning every row, and no
+    # concatenated copy of the six columns is materialized.
+    for column in (
+        chem_prop["prefix"],
+        chem_xref["prefix"],
+        comp_prop["prefix"],
+        comp_xref["prefix"],
+        reac_prop["prefix"],
+        reac_xref["prefix"],
+    ):
+        prefixes.update(column.unique())
     return prefixes
@@ -17,7 +17,9 @@
 
 
 import logging
-from typing import Dict, List
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 import pyparsing as pp
 from cobra_component_models.orm import Participant
@@ -26,6 +28,68 @@ from cobra_component_models.orm import Participant
 logger = logging.getLogger()
 
 
+# The equation language is regular, so the common case is handled by a single
+# compiled pattern instead of the pyparsing grammar below; one C-level scan
+# per side replaces per-token Python dispatch.
+_PARTICIPANT_PATTERN = re.compile(
+    r"(?P<coefficient>\((?:[^()]|\([^()]*\))*\)|[0-9Ee+-]+(?:\.[0-9Ee+-]+)?)"
+    r"\s+(?P<compound>MNXM\d+|WATER|BIOMASS)"
+    r"\s*@\s*(?P<compartment>MNXC\d+|MNXD\d+|MNXDX|BOUNDARY)"
+)
+_SEPARATOR_PATTERN = re.compile(r"\s*\+\s*")
+
+
+_WORKER_MAPPINGS = None
+
+
+def initialize_equation_worker(
+    compound_mapping: Dict[str, int], compartment_mapping: Dict[str, int]
+) -> None:
+    """
+    Store the identifier mappings for later equation parsing.
+
+    Designed as a process pool initializer so that the potentially large
+    mappings are shipped to every worker once rather than with every batch.
+
+    Parameters
+    ----------
+    compound_mapping : dict
+        A map from MetaNetX compound identifier to compound primary key.
+    compartment_mapping : dict
+        A map from MetaNetX compartment identifier to compartment primary key.
+
+    """
+    global _WORKER_MAPPINGS
+    _WORKER_MAPPINGS = (compound_mapping, compartment_mapping)
+
+
+def parse_equation_batch(equations: List[str]) -> List[List[dict]]:
+    """
+    Parse a batch of reaction equations into participant row dictionaries.
+
+    The identifier mappings must have been set up with
+    ``initialize_equation_worker`` beforehand.
+
+    Parameters
+    ----------
+    equations : list
+        The reaction equation strings.
+
+    Returns
+    -------
+    list
+        Per equation, the list of participant row dictionaries.
+
+    """
+    compound_mapping, compartment_mapping = _WORKER_MAPPINGS
+    return [
+        EquationParser.parse_participant_rows(
+            equation, compound_mapping, compartment_mapping
+        )
+        for equation in equations
+    ]
+
+
 class EquationParser:
     """Define a parser for MetaNetX reaction equations."""
 
@@ -45,8 +109,11 @@ class EquationParser:
     """
 
     number = pp.Word(pp.nums + "Ee+-")
+    # MatchFirst stops at the first alternative that succeeds instead of
+    # scoring all three like Or; ordering the decimal form before the plain
+    # number keeps the longest-match behavior for coefficients such as "0.5".
     coefficient = pp.originalTextFor(
-        number ^ pp.Combine(number + "." + number) ^ pp.nestedExpr(ignoreExpr=None)
+        pp.nestedExpr(ignoreExpr=None) | pp.Combine(number + "." + number) | number
     )
     coefficient.setName("coefficient")
     coefficient.__doc__ = """
@@ -70,6 +137,102 @@ class EquationParser:
     reaction.setName("reaction")
     reaction.__doc__ = """
     """
+    # Flatten the grammar once at class definition instead of on first parse.
+    # Packrat memoization is deliberately not enabled; for a flat,
+    # non-recursive grammar like this one the cache bookkeeping costs more
+    # than the backtracking it avoids.
+    reaction.streamline()
+
+    @classmethod
+    def _parse_side(
+        cls, side: str, is_product: bool
+    ) -> List[Tuple[str, str, str, bool]]:
+        """
+        Parse one side of an equation with the compiled pattern.
+
+        Raises
+        ------
+        ValueError
+            If the side is not fully covered by participants separated by
+            plus signs, mirroring the ``parseAll`` semantics of the grammar.
+
+        """
+        side = side.strip()
+        participants = []
+        position = 0
+        for match in _PARTICIPANT_PATTERN.finditer(side):
+            gap = side[position : match.start()]
+            if position == 0:
+                if gap:
+                    raise ValueError(f"Unexpected token in equation side '{side}'.")
+            elif not _SEPARATOR_PATTERN.fullmatch(gap):
+                raise ValueError(f"Unexpected token in equation side '{side}'.")
+            participants.append(
+                (
+                    match["coefficient"],
+                    match["compound"],
+                    match["compartment"],
+                    is_product,
+                )
+            )
+            position = match.end()
+        if position != len(side):
+            raise ValueError(f"Unexpected token in equation side '{side}'.")
+        return participants
+
+    @classmethod
+    def _parse_equation(cls, equation: str) -> List[Tuple[str, str, str, bool]]:
+        """Split an equation into participant tuples, fast path first."""
+        substrates, separator, products = equation.partition("=")
+        if separator:
+            try:
+                return cls._parse_side(substrates, False) + cls._parse_side(
+                    products, True
+                )
+            except ValueError:
+                pass
+        # Anything the pattern cannot cover falls back to the full grammar,
+        # which also raises the customary parse errors.
+        rxn = cls.reaction.parseString(equation, parseAll=True)
+        return [
+            (p.coefficient, p.compound, p.compartment, False) for p in rxn.substrates
+        ] + [(p.coefficient, p.compound, p.compartment, True) for p in rxn.products]
+
+    @classmethod
+    def parse_participant_rows(
+        cls,
+        equation: str,
+        compound_mapping: Dict[str, int],
+        compartment_mapping: Dict[str, int],
+    ) -> List[dict]:
+        """
+        Parse a reaction equation from string to table row dictionaries.
+
+        Parameters
+        ----------
+        equation
+        compound_mapping
+        compartment_mapping
+
+        Returns
+        -------
+        list
+            All the parsed reaction participants as row dictionaries suitable
+            for a Core bulk insert. The foreign key to the reaction is stamped
+            in by the caller once the primary keys are known.
+
+        """
+        return [
+            {
+                "compound_id": compound_mapping[compound],
+                "compartment_id": compartment_mapping[compartment],
+                "stoichiometry": coefficient,
+                "is_product": is_product,
+            }
+            for coefficient, compound, compartment, is_product in _parse_cached(
+                equation
+            )
+        ]
 
     @classmethod
     def parse_participants(
@@ -97,23 +260,26 @@ class EquationParser:
         cobra_component_models.orm.Participant
 
         """
-        rxn = cls.reaction.parseString(equation, parseAll=True)
-        result = [
+        return [
             Participant(
-                compound_id=compound_mapping[p.compound],
-                compartment_id=compartment_mapping[p.compartment],
-                stoichiometry=p.coefficient,
-                is_product=False,
+                compound_id=compound_mapping[compound],
+                compartment_id=compartment_mapping[compartment],
+                stoichiometry=coefficient,
+                is_product=is_product,
             )
-            for p in rxn.substrates
-        ]
-        result.extend(
-            Participant(
-                compound_id=compound_mapping[p.compound],
-                compartment_id=compartment_mapping[p.compartment],
-                stoichiometry=p.coefficient,
-                is_product=True,
+            for coefficient, compound, compartment, is_product in _parse_cached(
+                equation
             )
-            for p in rxn.products
-        )
-        return result
+        ]
+
+
+@lru_cache(maxsize=8192)
+def _parse_cached(equation: str) -> Tuple[Tuple[str, str, str, bool], ...]:
+    """
+    Parse an equation into participant tuples, memoizing duplicates.
+
+    The tables repeat equation strings, for example, generic transport
+    templates; repeats resolve to a cache hit. The result is independent of
+    the identifier mappings, which are applied by the calling methods.
+    """
+    return tuple(EquationParser._parse_equation(equation))
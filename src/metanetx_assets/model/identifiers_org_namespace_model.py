@@ -32,9 +32,7 @@ class IdentifiersOrgNamespaceModel(BaseModel):
     """
 
     prefix: str
-    miriam_id: str = Field(
-        ..., alias="mirId", regex=r"^MIR:\d{8}$", min_length=12, max_length=12
-    )
+    miriam_id: str = Field(..., alias="mirId", regex=r"^MIR:\d{8}$")
     name: str
     pattern: str
     description: str
@@ -0,0 +1,108 @@
+# Copyright (c) 2020, Moritz E. Beber.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Test the formatting of rows streamed through PostgreSQL ``COPY``."""
+
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table
+
+from metanetx_assets.api.helpers import _copy_rows
+
+
+class StubCursor:
+    """Record the statement and payload instead of talking to a database."""
+
+    def __init__(self):
+        """Initialize empty recording slots."""
+        self.statement = None
+        self.payload = None
+
+    def copy_expert(self, statement, buffer):
+        """Store the arguments that psycopg2 would send to the server."""
+        self.statement = statement
+        self.payload = buffer.read()
+
+    def __enter__(self):
+        """Return the cursor itself as the context."""
+        return self
+
+    def __exit__(self, *_):
+        """Pass exceptions on unchanged."""
+        return False
+
+
+class StubConnection:
+    """Mimic a connection whose ``connection`` is the raw DBAPI one."""
+
+    def __init__(self, cursor: StubCursor):
+        """Alias the raw connection to self and store the cursor."""
+        self.connection = self
+        self._cursor = cursor
+
+    def cursor(self):
+        """Return the recording cursor."""
+        return self._cursor
+
+
+class StubSession:
+    """Mimic the session attribute chain down to the DBAPI cursor."""
+
+    def __init__(self, cursor: StubCursor):
+        """Wrap the cursor in a stub connection."""
+        self._connection = StubConnection(cursor)
+
+    def connection(self):
+        """Return the stub connection."""
+        return self._connection
+
+
+@pytest.fixture()
+def table() -> Table:
+    """Provide a table with a Python-side column default."""
+    return Table(
+        "compartment_names",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("name", String, nullable=False),
+        Column("created_on", DateTime, default=lambda: datetime(2020, 1, 1)),
+    )
+
+
+def test_copy_rows_distinguishes_null_from_empty(table: Table) -> None:
+    """Expect that only ``None`` becomes NULL while '' stays a string."""
+    cursor = StubCursor()
+    _copy_rows(StubSession(cursor), table, [{"name": ""}, {"name": None}])
+    lines = cursor.payload.splitlines()
+    assert lines[0] == '"","2020-01-01 00:00:00"'
+    assert lines[1] == ',"2020-01-01 00:00:00"'
+
+
+def test_copy_rows_escapes_special_characters(table: Table) -> None:
+    """Expect that quotes, commas, and newlines survive the round trip."""
+    cursor = StubCursor()
+    _copy_rows(StubSession(cursor), table, [{"name": 'per,i"plasm\nspace'}])
+    assert cursor.payload.startswith('"per,i""plasm\nspace"')
+
+
+def test_copy_rows_statement_lists_default_columns(table: Table) -> None:
+    """Expect the statement to include the appended default columns."""
+    cursor = StubCursor()
+    _copy_rows(StubSession(cursor), table, [{"name": "cytosol"}])
+    assert cursor.statement == (
+        'COPY "compartment_names" ("name", "created_on") FROM STDIN WITH CSV'
+    )
@@ -0,0 +1,96 @@
+# Copyright (c) 2020, Moritz E. Beber.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Test the transformation of compartment rows into batches."""
+
+
+from typing import Dict
+
+import pytest
+
+from metanetx_assets.etl import build_compartment_batch
+
+
+@pytest.fixture()
+def prefix_to_nsid() -> Dict[str, int]:
+    """Provide a map from namespace prefix to primary key."""
+    return {"metanetx.compartment": 1, "go": 2}
+
+
+def test_row_names_are_preferred(prefix_to_nsid: Dict[str, int]) -> None:
+    """Expect that only names from the property row are flagged preferred."""
+    xref_by_mnx = {"MNXC2": [("go", "GO:0005575", {"cellular component"})]}
+    batch = build_compartment_batch(
+        [("MNXC2", {"cytosol"}, "go", "GO:0005829")],
+        xref_by_mnx,
+        {},
+        prefix_to_nsid,
+    )
+    ((_, name_rows, _),) = batch
+    preferred = {row["name"]: row["is_preferred"] for row in name_rows}
+    assert preferred == {"cytosol": True, "cellular component": False}
+
+
+def test_identifiers_are_deduplicated(prefix_to_nsid: Dict[str, int]) -> None:
+    """Expect cross-references repeating known identifiers to be dropped."""
+    xref_by_mnx = {
+        "MNXC2": [
+            ("go", "GO:0005829", set()),
+            ("metanetx.compartment", "MNXC2", set()),
+            ("go", "GO:0005575", set()),
+        ]
+    }
+    depr_by_mnx = {"MNXC2": ["MNXC9", "MNXC9"]}
+    batch = build_compartment_batch(
+        [("MNXC2", set(), "go", "GO:0005829")],
+        xref_by_mnx,
+        depr_by_mnx,
+        prefix_to_nsid,
+    )
+    ((_, _, annotation_rows),) = batch
+    identifiers = [row["identifier"] for row in annotation_rows]
+    assert identifiers == ["GO:0005829", "MNXC2", "GO:0005575", "MNXC9"]
+
+
+def test_unknown_prefixes_are_skipped(prefix_to_nsid: Dict[str, int]) -> None:
+    """Expect rows and cross-references with unknown prefixes to be skipped."""
+    xref_by_mnx = {"MNXC2": [("cco", "CCO:0000329", {"inner membrane"})]}
+    batch = build_compartment_batch(
+        [("MNXC2", {"cytosol"}, "seed", "c0")],
+        xref_by_mnx,
+        {},
+        prefix_to_nsid,
+    )
+    ((_, name_rows, annotation_rows),) = batch
+    assert name_rows == []
+    # The MetaNetX identifier itself is always annotated.
+    assert annotation_rows == [
+        {"identifier": "MNXC2", "namespace_id": 1, "is_deprecated": False}
+    ]
+
+
+def test_deprecated_identifiers_are_flagged(prefix_to_nsid: Dict[str, int]) -> None:
+    """Expect deprecated MetaNetX identifiers to be marked as such."""
+    batch = build_compartment_batch(
+        [("MNXC2", set(), "go", "GO:0005829")],
+        {},
+        {"MNXC2": ["MNXC9"]},
+        prefix_to_nsid,
+    )
+    ((_, _, annotation_rows),) = batch
+    deprecated = {
+        row["identifier"]: row["is_deprecated"] for row in annotation_rows
+    }
+    assert deprecated == {"GO:0005829": False, "MNXC2": False, "MNXC9": True}
@@ -0,0 +1,108 @@
+# Copyright (c) 2020, Moritz E. Beber.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Test the transformation of compound rows into batches."""
+
+
+from typing import Dict, Tuple
+
+import pytest
+
+from metanetx_assets.etl import build_compound_batch
+
+
+@pytest.fixture()
+def prefix_to_nsid() -> Dict[str, int]:
+    """Provide a map from namespace prefix to primary key."""
+    return {"metanetx.chemical": 1, "chebi": 2}
+
+
+@pytest.fixture()
+def water_row() -> Tuple:
+    """Provide one compound row in the builder's positional layout."""
+    return (
+        "MNXM2",
+        {"water"},
+        "chebi",
+        "CHEBI:15377",
+        "InChI=1S/H2O/h1H2",
+        "XLYOFNOQVPJJNP-UHFFFAOYSA-N",
+        "O",
+        "H2O",
+        0,
+        18.01,
+    )
+
+
+def test_compound_row_carries_structure(
+    water_row: Tuple, prefix_to_nsid: Dict[str, int]
+) -> None:
+    """Expect the structural fields to be mapped onto the compound row."""
+    ((comp, _, _),) = build_compound_batch([water_row], {}, {}, prefix_to_nsid)
+    assert comp == {
+        "inchi": "InChI=1S/H2O/h1H2",
+        "inchi_key": "XLYOFNOQVPJJNP-UHFFFAOYSA-N",
+        "smiles": "O",
+        "chemical_formula": "H2O",
+        "charge": 0,
+        "mass": 18.01,
+    }
+
+
+def test_row_names_are_preferred(
+    water_row: Tuple, prefix_to_nsid: Dict[str, int]
+) -> None:
+    """Expect that only names from the property row are flagged preferred."""
+    xref_by_mnx = {"MNXM2": [("chebi", "CHEBI:33813", {"oxidane", "water"})]}
+    ((_, name_rows, _),) = build_compound_batch(
+        [water_row], xref_by_mnx, {}, prefix_to_nsid
+    )
+    preferred = {row["name"]: row["is_preferred"] for row in name_rows}
+    assert preferred == {"water": True, "oxidane": False}
+
+
+def test_identifiers_are_deduplicated(
+    water_row: Tuple, prefix_to_nsid: Dict[str, int]
+) -> None:
+    """Expect cross-references repeating known identifiers to be dropped."""
+    xref_by_mnx = {
+        "MNXM2": [
+            ("chebi", "CHEBI:15377", set()),
+            ("metanetx.chemical", "MNXM2", set()),
+            ("chebi", "CHEBI:33813", set()),
+        ]
+    }
+    depr_by_mnx = {"MNXM2": ["MNXM01", "MNXM01"]}
+    ((_, _, annotation_rows),) = build_compound_batch(
+        [water_row], xref_by_mnx, depr_by_mnx, prefix_to_nsid
+    )
+    identifiers = [row["identifier"] for row in annotation_rows]
+    assert identifiers == ["CHEBI:15377", "MNXM2", "CHEBI:33813", "MNXM01"]
+
+
+def test_unknown_prefixes_are_skipped(
+    water_row: Tuple, prefix_to_nsid: Dict[str, int]
+) -> None:
+    """Expect rows and cross-references with unknown prefixes to be skipped."""
+    row = ("MNXM2", {"water"}, "kegg.compound") + water_row[3:]
+    xref_by_mnx = {"MNXM2": [("hmdb", "HMDB0002111", {"water"})]}
+    ((_, name_rows, annotation_rows),) = build_compound_batch(
+        [row], xref_by_mnx, {}, prefix_to_nsid
+    )
+    assert name_rows == []
+    # The MetaNetX identifier itself is always annotated.
+    assert annotation_rows == [
+        {"identifier": "MNXM2", "namespace_id": 1, "is_deprecated": False}
+    ]
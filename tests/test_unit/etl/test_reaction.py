@@ -18,6 +18,7 @@
 
 from pathlib import Path
 
+import pyparsing as pp
 import pytest
 
 from metanetx_assets.etl import EquationParser
@@ -37,3 +38,36 @@ def test_failing_equations(equation: str) -> None:
     """Test that parsing succeeds but mapping fails."""
     with pytest.raises(KeyError):
         EquationParser.parse_participants(equation, {}, {})
+
+
+@pytest.mark.parametrize(
+    "equation",
+    EQUATIONS
+    + [
+        "1 MNXM1@MNXC3 = 2 MNXM2@MNXC3",
+        "(2n) MNXM1@MNXC3 + 0.5 WATER@BOUNDARY = 1.5e2 BIOMASS@MNXD1",
+        "1 MNXM1@MNXDX =",
+        "= 1 MNXM1@MNXC3",
+    ],
+)
+def test_fast_path_matches_grammar(equation: str) -> None:
+    """Expect the regex fast path to reproduce the grammar's parse exactly."""
+    substrates, _, products = equation.partition("=")
+    fast = EquationParser._parse_side(substrates, False) + EquationParser._parse_side(
+        products, True
+    )
+    result = EquationParser.reaction.parseString(equation, parseAll=True)
+    expected = [
+        (p.coefficient, p.compound, p.compartment, False) for p in result.substrates
+    ] + [(p.coefficient, p.compound, p.compartment, True) for p in result.products]
+    assert fast == expected
+    assert EquationParser._parse_equation(equation) == expected
+
+
+@pytest.mark.parametrize(
+    "equation", ["1 BOGUS@MNXC3 =", "1 MNXM1@MNXC3 junk =", "no equals sign"]
+)
+def test_malformed_equations_raise(equation: str) -> None:
+    """Expect that input the fast path rejects raises the grammar's error."""
+    with pytest.raises(pp.ParseException):
+        EquationParser._parse_equation(equation)